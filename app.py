@@ -13,29 +13,10 @@ if "questions" not in st.session_state:
 
 questions = st.session_state.questions
 
-responses = {}
-
-# -----------------------------
-# RENDER QUESTIONS
-# -----------------------------
-for q in questions:
-    if q["type"] == "radio":
-        responses[q["id"]] = st.radio(
-            q["label"], q["options"], key=q["id"]
-        )
-    elif q["type"] == "multiselect":
-        responses[q["id"]] = st.multiselect(
-            q["label"], q["options"], key=q["id"]
-        )
-    elif q["type"] == "text":
-        responses[q["id"]] = st.text_input(
-            q["label"], key=q["id"]
-        )
-
 # -----------------------------
-# SUBMIT BUTTON (ONLY TRIGGER)
+# SUBMISSION
 # -----------------------------
-if st.button("Submit"):
+def show_style_summary(responses):
     st.subheader("Collected Preferences (JSON)")
     st.json(responses)
 
@@ -45,3 +26,36 @@ if st.button("Submit"):
 
     st.subheader("Generated Style Summary")
     st.write(style_paragraph)
+
+# -----------------------------
+# QUESTIONNAIRE FRAGMENT
+# (submitting the form reruns only this function)
+# -----------------------------
+@st.fragment
+def questionnaire(questions):
+    responses = {}
+
+    with st.form("style_form"):
+        for q in questions:
+            if q["type"] == "radio":
+                responses[q["id"]] = st.radio(
+                    q["label"], q["options"], key=q["id"]
+                )
+            elif q["type"] == "multiselect":
+                responses[q["id"]] = st.multiselect(
+                    q["label"], q["options"], key=q["id"]
+                )
+            elif q["type"] == "text":
+                responses[q["id"]] = st.text_input(
+                    q["label"], key=q["id"]
+                )
+
+        # -----------------------------
+        # SUBMIT BUTTON (ONLY TRIGGER)
+        # -----------------------------
+        submitted = st.form_submit_button("Submit")
+
+    if submitted:
+        show_style_summary(responses)
+
+questionnaire(questions)
@@ -1,7 +1,32 @@
+"""
+store_styling_rules_pinecone.py
+
+Embeds the styling rules in DATA_FILE and upserts them into Pinecone.
+
+Ingest-only dependencies (requirements.txt covers the Streamlit app):
+- torch, numpy, tqdm, sentence-transformers
+- ijson                          (streamed JSON input)
+- pinecone[grpc]                 (gRPC upsert client)
+- sentence-transformers[onnx]>=3.2
+                                 (CPU int8 ONNX path only; any
+                                  sentence-transformers works on CUDA)
+"""
+
+import os
 import json
+import time
+import random
+import sqlite3
+import hashlib
+import ijson
 import torch
+import numpy as np
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
 from tqdm import tqdm
-from pinecone import Pinecone, ServerlessSpec
+from pinecone import ServerlessSpec
+from pinecone.grpc import PineconeGRPC as Pinecone  # protobuf over HTTP/2
 from sentence_transformers import SentenceTransformer
 
 # ------------------------------------
@@ -15,14 +40,102 @@ DATA_FILE = "fashion_data_enhanced_optimized_no_orig.json"
 # HuggingFace embedding model (1024 dimensions)
 MODEL_NAME = "BAAI/bge-large-en-v1.5"
 
+# int8 ONNX export of MODEL_NAME used for CPU ingest (same 1024-dim space)
+ONNX_MODEL_DIR = "bge-large-en-v1.5-onnx"
+ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# on-disk embedding cache: sha256(model + text) -> FP16 vector bytes
+EMBED_CACHE_FILE = "embedding_cache.sqlite"
+
 # ------------------------------------
 # INIT CLIENTS
 # ------------------------------------
 pc = Pinecone(api_key=PINECONE_API_KEY)
 
+def load_int8_onnx_model():
+    # needs sentence-transformers[onnx]>=3.2; imported here so the CUDA
+    # path works with any sentence-transformers version
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    # export + quantize once, then reuse the local copy on later runs
+    if not os.path.exists(os.path.join(ONNX_MODEL_DIR, ONNX_INT8_FILE)):
+        print("Exporting int8 ONNX embedding model (first run only)...")
+        onnx_model = SentenceTransformer(MODEL_NAME, backend="onnx")
+        onnx_model.save_pretrained(ONNX_MODEL_DIR)
+        export_dynamic_quantized_onnx_model(onnx_model, "avx512_vnni", ONNX_MODEL_DIR)
+
+    return SentenceTransformer(
+        ONNX_MODEL_DIR,
+        backend="onnx",
+        model_kwargs={"file_name": ONNX_INT8_FILE}
+    )
+
 # load 1024-dim HF embedding model
-print("Loading HuggingFace embedding model...")
-model = SentenceTransformer(MODEL_NAME)
+# (FP16 on GPU, int8 ONNX Runtime on CPU)
+device = "cuda" if torch.cuda.is_available() else "cpu"
+print(f"Loading HuggingFace embedding model on {device}...")
+
+if device == "cuda":
+    model = SentenceTransformer(MODEL_NAME, device=device).half()
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
+else:
+    model = load_int8_onnx_model()
+
+encode_batch_size = 128 if device == "cuda" else 64
+
+# ------------------------------------
+# EMBEDDING CACHE
+# ------------------------------------
+# unchanged rules skip the forward pass on reruns; the key includes the
+# model variant since FP16 and int8 vectors differ slightly
+model_tag = f"{MODEL_NAME}:{'fp16' if device == 'cuda' else 'onnx-int8'}"
+
+cache_db = sqlite3.connect(EMBED_CACHE_FILE)
+cache_db.execute(
+    "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB)"
+)
+
+# keep each lookup under SQLite's old 999 bind-parameter limit (< 3.32)
+CACHE_LOOKUP_SLICE = 900
+
+def text_key(text):
+    return hashlib.sha256(f"{model_tag}\n{text}".encode("utf-8")).digest()
+
+def embed_with_cache(texts):
+    keys = [text_key(t) for t in texts]
+    cached = {}
+    for i in range(0, len(keys), CACHE_LOOKUP_SLICE):
+        part = keys[i:i + CACHE_LOOKUP_SLICE]
+        placeholders = ",".join("?" * len(part))
+        cached.update(cache_db.execute(
+            f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+        ))
+
+    missing = [i for i, k in enumerate(keys) if k not in cached]
+    if missing:
+        # encode() sorts the texts by length, batches similar-length texts
+        # together (less padding), and restores the original order in its
+        # output, so new[j] still matches texts[missing[j]].
+        new = model.encode(
+            [texts[i] for i in missing],
+            batch_size=encode_batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=True
+        ).astype(np.float16)
+
+        cache_db.executemany(
+            "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+            [(keys[i], vec.tobytes()) for i, vec in zip(missing, new)]
+        )
+        cache_db.commit()
+        cached.update((keys[i], vec.tobytes()) for i, vec in zip(missing, new))
+
+    # FP16 on disk, FP32 for Pinecone
+    return np.vstack(
+        [np.frombuffer(cached[k], dtype=np.float16) for k in keys]
+    ).astype(np.float32)  # (len(texts), 1024) array
 
 # ------------------------------------
 # CREATE INDEX IF NOT EXISTS
@@ -50,54 +163,125 @@ def load_jsonl(path):
             yield json.loads(line)
 
 def load_json(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # stream rules one at a time instead of json.load()-ing the whole file
+    with open(path, "rb") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+
+        if first == b"[":
+            # [ {rule}, {rule}, ... ]
+            yield from ijson.items(f, "item")
+        else:
+            # { "rule_id": {rule}, ... }
+            for rule_id, rule in ijson.kvitems(f, ""):
+                rule.setdefault("id", rule_id)
+                yield rule
 
 if DATA_FILE.endswith(".jsonl"):
-    dataset = list(load_jsonl(DATA_FILE))
+    dataset = load_jsonl(DATA_FILE)
 else:
     dataset = load_json(DATA_FILE)
 
-print(f"Loaded {len(dataset)} styling rule entries.")
-
 # ------------------------------------
-# EMBEDDING FUNCTION
+# EMBED + UPSERT INTO PINECONE
 # ------------------------------------
-def embed_text(text):
-    vec = model.encode(text, convert_to_tensor=True)
-    return vec.cpu().tolist()  # 1024-dim vector
+# Rules are read and embedded a chunk at a time while the upserts of the
+# previous chunk are still in flight on the thread pool, so network
+# round-trips overlap with parsing, the transformer forward pass and with
+# each other. The full dataset is never held in memory.
+encode_chunk_size = 1000
+upsert_workers = 5
 
-# ------------------------------------
-# UPSERT INTO PINECONE
-# ------------------------------------
-batch = []
-batch_size = 50
+# Pinecone upsert limits: 2 MB per request, 1000 vectors per request
+upsert_max_bytes = 2 * 1024 * 1024 - 64 * 1024  # headroom for request framing
+upsert_max_vectors = 1000
+
+# at most `upsert_workers` prepared batches wait on the network at once
+pending_upserts = BoundedSemaphore(upsert_workers)
+futures = []
+total = 0
+
+def batch_generator(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+def record_size(record):
+    # rough payload estimate: FP32 values + id + metadata strings
+    rule_id, values, meta = record
+    return (
+        4 * len(values)
+        + len(rule_id.encode("utf-8"))
+        + len(meta["text"].encode("utf-8"))
+        + len(meta["type"])
+    )
+
+def upsert_batch_generator(records):
+    # close a batch before it would exceed either Pinecone limit
+    batch, batch_bytes = [], 0
+    for record in records:
+        size = record_size(record)
+        if batch and (
+            batch_bytes + size > upsert_max_bytes
+            or len(batch) >= upsert_max_vectors
+        ):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(record)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+def upsert_batch(records):
+    try:
+        # small jitter so concurrent requests don't hit the rate limiter together
+        time.sleep(random.uniform(0, 0.05))
+        index.upsert(vectors=records)
+        progress.update(1)
+    finally:
+        pending_upserts.release()
+
+def submit_upsert(pool, records):
+    # fail fast: re-raise the first finished upsert's error before queueing
+    # more work, and drop finished futures so the list stays small
+    done = [f for f in futures if f.done()]
+    for future in done:
+        future.result()
+    futures[:] = [f for f in futures if f not in done]
+
+    pending_upserts.acquire()
+    futures.append(pool.submit(upsert_batch, records))
+
+print("Embedding and uploading vectors to Pinecone...")
+
+# one progress tick per upserted batch, not per rule
+progress = tqdm(unit="batch", desc="Upserting")
 
-print("Uploading vectors to Pinecone...")
+with ThreadPoolExecutor(max_workers=upsert_workers) as pool:
+    for chunk in batch_generator(dataset, encode_chunk_size):
 
-for item in tqdm(dataset):
+        # parallel columns: ids[i], texts[i] and metas[i] describe the same rule
+        ids = [item["id"] for item in chunk]
+        texts = [item["text"] for item in chunk]
+        metas = [{"type": item["type"], "text": item["text"]} for item in chunk]
 
-    vector = embed_text(item["text"])  # HF embeddings
+        vectors = embed_with_cache(texts)
 
-    record = {
-        "id": item["id"],
-        "values": vector,
-        "metadata": {
-            "type": item["type"],
-            "text": item["text"]
-        }
-    }
+        # (id, values, metadata) tuples, accepted by index.upsert
+        records = list(zip(ids, vectors.tolist(), metas))
+        total += len(records)
 
-    batch.append(record)
+        for batch in upsert_batch_generator(records):
+            submit_upsert(pool, batch)
 
-    # batch upload
-    if len(batch) >= batch_size:
-        index.upsert(vectors=batch)
-        batch = []
+# surface errors from the last batches still in flight
+for future in futures:
+    future.result()
 
-# upload remaining
-if batch:
-    index.upsert(vectors=batch)
+progress.close()
+cache_db.close()
 
-print("\n✨ Upload complete — styling rules successfully stored in Pinecone!")
+print(f"\n✨ Upload complete — {total} styling rules successfully stored in Pinecone!")
 print("Index:", INDEX_NAME)
@@ -1,16 +1,19 @@
+import streamlit as st
 from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 import json
 import os
 
 # -----------------------------
-# INITIALIZE LLM ONCE
+# INITIALIZE LLM ONCE PER PROCESS
 # -----------------------------
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0.4,
-    groq_api_key=os.getenv("GROQ_API_KEY", "")
-)
+@st.cache_resource(show_spinner=False)
+def get_llm():
+    return ChatGroq(
+        model="llama-3.1-8b-instant",
+        temperature=0.4,
+        groq_api_key=os.getenv("GROQ_API_KEY", "")
+    )
 
 prompt = PromptTemplate(
     input_variables=["preferences"],
@@ -37,7 +40,7 @@ Strict Rules:
 12. Avoid vague value adjectives such as chic, fashionable, or stylish unless
     explicitly stated in the input.
 
-User preferences (JSON):
+User preferences:
 {preferences}
 
 Generate a concise fashion style profile that strictly reflects the
@@ -49,9 +52,23 @@ explicit preferences without extrapolation.
 # my fashion preferences in a way that is highly searchable and
 # semantically aligned with styling rules.
 
-def generate_style_paragraph(preferences: dict) -> str:
+def format_preferences(preferences: dict) -> str:
+    # compact "key: value" lines -> fewer prompt tokens than indented JSON
+    lines = []
+    for key, value in preferences.items():
+        if isinstance(value, list):
+            value = ", ".join(value)
+        lines.append(f"{key}: {value}")
+    return "\n".join(lines)
+
+@st.cache_data(ttl=3600, max_entries=1024, show_spinner=False)
+def _cached_style_paragraph(preferences_json: str) -> str:
     formatted_prompt = prompt.format(
-        preferences=json.dumps(preferences, indent=2)
+        preferences=format_preferences(json.loads(preferences_json))
     )
-    response = llm.invoke(formatted_prompt)
+    response = get_llm().invoke(formatted_prompt)
     return response.content
+
+def generate_style_paragraph(preferences: dict) -> str:
+    # identical answers (in any key order) reuse the cached summary
+    return _cached_style_paragraph(json.dumps(preferences, sort_keys=True))
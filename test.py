@@ -28,8 +28,8 @@ query = "Youthful trendy outfits for casual workout occasions, complementing nat
 
 print(f"\n🔍 Query: {query}")
 
-# embed
-q_vec = model.encode(query).tolist()
+# embed (normalized on-device, like the stored rule vectors)
+q_vec = model.encode(query, normalize_embeddings=True).tolist()
 
 # ------------------------------------
 # RUN VECTOR SEARCH
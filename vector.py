@@ -11,12 +11,20 @@ FINAL VERSION – PRODUCTION SAFE
 
 import re
 import uuid
+import ahocorasick
 import requests
 from bs4 import BeautifulSoup
 from docx import Document
 from pptx import Presentation
 from pypdf import PdfReader
 
+# lxml's C parser is much faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 # =========================================================
 # SOURCES
 # =========================================================
@@ -57,6 +65,28 @@ ACCESSORY_TERMS = [
     "choker", "ring", "hat", "scarf", "accessories"
 ]
 
+# category -> terms, scanned together in a single Aho–Corasick pass
+TERM_GROUPS = {
+    "fit": FIT_TERMS,
+    "color": COLOR_TERMS,
+    "style": STYLE_TERMS,
+    "items": ITEM_TERMS,
+    "occasion": OCCASION_TERMS,
+    "layering": LAYER_TERMS,
+    "pairing": PAIRING_VERBS,
+    "accessory": ACCESSORY_TERMS,
+}
+
+# =========================================================
+# COMPILED PATTERNS
+# =========================================================
+
+WHITESPACE_RE = re.compile(r"\s+")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+BAGGY_RE = re.compile(r"\bbaggy\b")
+LOOSE_RE = re.compile(r"\bloose\b")
+SLIM_FIT_RE = re.compile(r"\bslim-fit\b")
+
 # =========================================================
 # EXTRACTION HELPERS
 # =========================================================
@@ -65,7 +95,7 @@ def extract_text_from_url(url):
     try:
         r = requests.get(url, timeout=20)
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = BeautifulSoup(r.text, HTML_PARSER)
 
         for t in soup(["script", "style", "nav", "header", "footer", "aside"]):
             t.decompose()
@@ -107,12 +137,30 @@ def extract_text_from_pptx(path):
 # =========================================================
 
 def split_sentences(text):
-    text = re.sub(r"\s+", " ", text.replace("\n", " ")).strip()
-    return [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if len(s.strip()) > 12]
-
-def contains_any(terms, text):
-    t = text.lower()
-    return any(term in t for term in terms)
+    # one whitespace pass (covers newlines); pieces split on the single
+    # remaining spaces are already trimmed, so no per-sentence strip()
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    return [s for s in SENTENCE_SPLIT_RE.split(text) if len(s) > 12]
+
+def build_term_automaton(groups):
+    automaton = ahocorasick.Automaton()
+    for category, terms in groups.items():
+        for term in terms:
+            # a term can belong to several categories (e.g. "casual", "jacket")
+            hits = automaton.get(term, [])
+            automaton.add_word(term, hits + [(category, term)])
+    automaton.make_automaton()
+    return automaton
+
+TERM_AUTOMATON = build_term_automaton(TERM_GROUPS)
+
+def match_terms(text):
+    """Return {category: set(terms)} for every vocabulary term found in text."""
+    found = {}
+    for _, hits in TERM_AUTOMATON.iter(text.lower()):
+        for category, term in hits:
+            found.setdefault(category, set()).add(term)
+    return found
 
 # =========================================================
 # CANONICALIZATION (STRICT)
@@ -129,23 +177,26 @@ def canonicalize_sentence(sentence):
 
     s = s.lower()
 
-    # 2️⃣ DROP ACCESSORY-ONLY CONTENT
-    if contains_any(ACCESSORY_TERMS, s) and not contains_any(ITEM_TERMS, s):
-        return ""
-
     # normalize wording
-    s = re.sub(r'\bbaggy\b', 'oversized', s)
-    s = re.sub(r'\bloose\b', 'relaxed', s)
-    s = re.sub(r'\bslim-fit\b', 'slim', s)
+    s = BAGGY_RE.sub('oversized', s)
+    s = LOOSE_RE.sub('relaxed', s)
+    s = SLIM_FIT_RE.sub('slim', s)
 
-    s = re.sub(r'\s+', ' ', s).strip()
+    s = WHITESPACE_RE.sub(' ', s).strip()
+
+    found = match_terms(s)
+    has_items = "items" in found
+
+    # 2️⃣ DROP ACCESSORY-ONLY CONTENT
+    if "accessory" in found and not has_items:
+        return ""
 
     # must be actionable
-    if contains_any(PAIRING_VERBS, s) and contains_any(ITEM_TERMS, s):
+    if "pairing" in found and has_items:
         return s.capitalize() + "."
 
     # layering rule with clothing
-    if contains_any(LAYER_TERMS, s) and contains_any(ITEM_TERMS, s):
+    if "layering" in found and has_items:
         return s.capitalize() + "."
 
     return ""
@@ -155,38 +206,16 @@ def canonicalize_sentence(sentence):
 # =========================================================
 
 def extract_metadata(text):
-    t = text.lower()
+    found = match_terms(text)
     meta = {
-        "fit": [],
-        "color": [],
-        "style": [],
-        "items": [],
-        "occasion": [],
-        "layering": False
+        "fit": list(found.get("fit", ())),
+        "color": list(found.get("color", ())),
+        "style": list(found.get("style", ())),
+        "items": list(found.get("items", ())),
+        "occasion": list(found.get("occasion", ())),
+        "layering": "layering" in found
     }
 
-    for term in FIT_TERMS:
-        if term in t:
-            meta["fit"].append(term)
-
-    for term in COLOR_TERMS:
-        if term in t:
-            meta["color"].append(term)
-
-    for term in STYLE_TERMS:
-        if term in t:
-            meta["style"].append(term)
-
-    for term in ITEM_TERMS:
-        if term in t:
-            meta["items"].append(term)
-
-    for term in OCCASION_TERMS:
-        if term in t:
-            meta["occasion"].append(term)
-
-    meta["layering"] = contains_any(LAYER_TERMS, t)
-
     # implicit inference
     if "blazer" in meta["items"]:
         meta["style"].append("classic")